@@ -1,22 +1,23 @@
 import os
-import schedule
-import csv
 import logging
 import requests
 import pandas as pd
 import re
 from datetime import datetime
 from bs4 import BeautifulSoup
-import os 
-import time 
-import csv 
-import logging 
-import schedule 
-import requests 
-import pandas as pd
-import re 
-from datetime import datetime
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from selectolax.parser import HTMLParser  # C-backed parser, much faster text extraction than bs4
+except ImportError:
+    HTMLParser = None
+
+try:
+    import orjson  # parses response bytes directly, faster than stdlib json
+except ImportError:
+    orjson = None
 
 # ----------------------------
 # CONFIG
@@ -27,6 +28,11 @@ SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 BUCKET_NAME = "Marketing Database"
 
+# Compiled once at import; extract_followers runs it over the whole page text
+FOLLOWERS_RE = re.compile(r"(\d+(?:,\d+)*)\s+followers", re.IGNORECASE)
+# Company pages carry "N followers" in their meta description; used as a fast path before parsing
+META_DESCRIPTION_RE = re.compile(r'<meta\s+name="description"\s+content="([^"]*)"', re.IGNORECASE)
+
 # Logging configuration
 logging.basicConfig(
     level=logging.INFO,
@@ -37,27 +43,53 @@ logging.basicConfig(
     ]
 )
 
+# ----------------------------
+# HTTP Session (keep-alive + retries)
+# ----------------------------
+def build_session():
+    """Returns a requests Session that pools HTTPS connections and retries transient failures."""
+    session = requests.Session()
+    retries = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False  # hand the last response back so callers can log its status
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+    return session
+
+
+SUPABASE_HEADERS = {
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}"
+}
+
+
+def parse_json(response):
+    """Decodes a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
 # ----------------------------
 # Supabase CSV Upload (HTTP with upsert)
 # ----------------------------
-def upload_csv_to_supabase(file_path, bucket_name):
+def upload_csv_to_supabase(file_path, bucket_name, session):
     """Uploads CSV to Supabase Storage, overwriting existing files if necessary."""
     file_name = os.path.basename(file_path)
     file_path = os.path.abspath(file_path)
 
     try:
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
-
         upload_url = f"{SUPABASE_URL}/storage/v1/object/{bucket_name}/{file_name}"
         headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
+            **SUPABASE_HEADERS,
             "Content-Type": "text/csv",
             "x-upsert": "true"  # forces overwrite
         }
 
-        response = requests.post(upload_url, headers=headers, data=file_bytes)
+        # Pass the file handle so requests streams it instead of buffering the whole CSV
+        with open(file_path, "rb") as f:
+            response = session.post(upload_url, headers=headers, data=f)
 
         if response.status_code in (200, 201):
             logging.info(f"✅ Successfully uploaded '{file_name}' to '{bucket_name}'.")
@@ -72,17 +104,25 @@ def upload_csv_to_supabase(file_path, bucket_name):
 # ----------------------------
 class LinkedInFollowerExtractor:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = build_session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
             "Accept-Language": "en-US,en;q=0.9",
         })
 
+    def extract_text(self, html_content):
+        if HTMLParser is not None:
+            tree = HTMLParser(html_content)
+            tree.strip_tags(["script", "style"])  # match bs4, which skips these in get_text()
+            return tree.root.text(separator="") if tree.root is not None else ""
+        return BeautifulSoup(html_content, "html.parser").get_text()
+
     def extract_followers(self, html_content):
-        soup = BeautifulSoup(html_content, "html.parser")
-        text_content = soup.get_text()
-        pattern = r"(\d+(?:,\d+)*)\s+followers"
-        match = re.search(pattern, text_content, re.IGNORECASE)
+        # The meta description usually carries the count, so only parse the page when it doesn't
+        meta = META_DESCRIPTION_RE.search(html_content)
+        match = FOLLOWERS_RE.search(meta.group(1)) if meta else None
+        if not match:
+            match = FOLLOWERS_RE.search(self.extract_text(html_content))
         return int(match.group(1).replace(",", "")) if match else None
 
     def get_followers(self, linkedin_url):
@@ -102,28 +142,27 @@ class LinkedInFollowerExtractor:
 # ----------------------------
 # Save Follower Data
 # ----------------------------
-def save_follower_data(followers):
+def save_follower_data(followers, session):
     """Save follower data to existing linkedin_followers.csv, then upload to Supabase."""
     try:
         # Use the existing CSV file in your GitHub repo
         file_path = os.path.join(os.getcwd(), "linkedin_followers.csv")
         file_exists = os.path.isfile(file_path)
 
-        # Prepare new record
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        data = {"timestamp": timestamp, "linkedin_url": LINKEDIN_URL, "followers": int(followers)}
+        # Prepare new record (CRLF terminators, matching the rows already in the file).
+        # LINKEDIN_URL contains no CSV special characters, so no quoting is needed.
+        line = f"{datetime.now():%Y-%m-%d %H:%M:%S},{LINKEDIN_URL},{int(followers)}\r\n"
 
         # Append to the existing CSV
         with open(file_path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["timestamp", "linkedin_url", "followers"])
             if not file_exists:
-                writer.writeheader()
-            writer.writerow(data)
+                f.write("timestamp,linkedin_url,followers\r\n")
+            f.write(line)
 
         logging.info(f"📊 Follower data saved locally to {file_path}: {followers}")
 
         # Upload same file to Supabase (no change to logic)
-        upload_csv_to_supabase(file_path, BUCKET_NAME)
+        upload_csv_to_supabase(file_path, BUCKET_NAME, session)
 
     except Exception as e:
         logging.error(f"❌ Error saving follower data: {e}")
@@ -133,7 +172,7 @@ def fetch_linkedin_followers():
     extractor = LinkedInFollowerExtractor()
     followers = extractor.get_followers(LINKEDIN_URL)
     if followers:
-        save_follower_data(followers)
+        save_follower_data(followers, build_session())
     else:
         logging.error("Failed to fetch followers")
 
@@ -144,8 +183,9 @@ def fetch_linkedin_posts():
     try:
         url = "https://api.scrapingdog.com/linkedin"
         params = {"api_key": SCRAPINGDOG_API_KEY, "type": "company", "linkId": "extrastaff-recruitment"}
-        response = requests.get(url, params=params, timeout=45)
-        data = response.json()
+        session = build_session()  # own session: this job runs alongside the followers job
+        response = session.get(url, params=params, timeout=45)
+        data = parse_json(response)
 
         if not data or not isinstance(data, list):
             logging.error("Invalid API response for posts")
@@ -164,11 +204,7 @@ def fetch_linkedin_posts():
             # -------------------
             try:
                 delete_url = f"{SUPABASE_URL}/storage/v1/object/{BUCKET_NAME}/{os.path.basename(file_path)}"
-                headers = {
-                    "apikey": SUPABASE_KEY,
-                    "Authorization": f"Bearer {SUPABASE_KEY}"
-                }
-                del_response = requests.delete(delete_url, headers=headers)
+                del_response = session.delete(delete_url, headers=SUPABASE_HEADERS)
                 if del_response.status_code in (200, 204):
                     logging.info("🗑 Old posts file deleted from Supabase (if it existed).")
                 else:
@@ -177,7 +213,7 @@ def fetch_linkedin_posts():
                 logging.error(f"Error deleting old posts file: {e}")
 
             # Upload new file
-            upload_csv_to_supabase(file_path, BUCKET_NAME)
+            upload_csv_to_supabase(file_path, BUCKET_NAME, session)
         else:
             logging.info("No new posts found")
 
@@ -185,10 +221,20 @@ def fetch_linkedin_posts():
         logging.error(f"Error fetching posts: {e}")
 
 
+# ----------------------------
+# Pipeline
+# ----------------------------
+def run_pipeline():
+    """Runs the followers and posts jobs side by side; each job builds its own HTTP session."""
+    logging.info("🚀 Running LinkedIn data pipeline...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        jobs = [executor.submit(fetch_linkedin_followers), executor.submit(fetch_linkedin_posts)]
+        for job in jobs:
+            job.result()
+
+
 # ----------------------------
 # Main execution
 # ----------------------------
 if __name__ == "__main__":
-    logging.info("🚀 Running LinkedIn data pipeline...")
-    fetch_linkedin_followers()
-    fetch_linkedin_posts()
+    run_pipeline()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+import pytest
+
+# main configures a FileHandler on import; keep its log out of the repo
+_cwd = os.getcwd()
+os.chdir(tempfile.mkdtemp())
+try:
+    import main
+finally:
+    os.chdir(_cwd)
+
+
+FIXTURES = {
+    "split_number": "<body><b>1</b><b>,234</b> followers</body>",
+    "title_only": "<html><head><title>Acme | 1,612 followers</title></head><body></body></html>",
+    "script_and_comment": (
+        "<!DOCTYPE html><html><head><script>var s='99 followers'</script><style>p{}</style></head>"
+        "<body><!-- 5 followers --><p>1,234 followers</p></body></html>"
+    ),
+    "meta_description": (
+        "<html><head><script>var s='99 followers'</script>"
+        '<meta name="description" content="Extrastaff Recruitment | 1,612 followers on LinkedIn.">'
+        "</head><body><p>1,600 followers</p></body></html>"
+    ),
+    "no_count": "<html><body><p>Extrastaff Recruitment</p></body></html>",
+}
+
+
+@pytest.mark.skipif(main.HTMLParser is None, reason="selectolax not installed")
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_selectolax_text_matches_bs4(name, monkeypatch):
+    extractor = main.LinkedInFollowerExtractor()
+    html = FIXTURES[name]
+
+    fast = extractor.extract_text(html)
+    monkeypatch.setattr(main, "HTMLParser", None)
+    assert fast == extractor.extract_text(html)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("split_number", 1234),
+    ("title_only", 1612),
+    ("script_and_comment", 1234),
+    ("meta_description", 1612),
+    ("no_count", None),
+])
+def test_extract_followers(name, expected):
+    assert main.LinkedInFollowerExtractor().extract_followers(FIXTURES[name]) == expected